@@ -1,4 +1,8 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import os
+import time
 import numpy as np
 
 
@@ -175,6 +179,21 @@ class Chip:
         standard_dev, mean= self._statistics(partial_distance)
         return global_distance, standard_dev, mean
 
+    def write_def(self, filename: str, graph: Optional[List[Edge]] = None) -> None:
+        """Writes the edges of the chip to a DEF output file.
+
+        Args:
+            filename: string with the output filename.
+            graph: edges to write, self.graph by default.
+        """
+        if graph is None:
+            graph = self.graph
+        with open(filename, "w") as output_file:
+            for e in graph:
+                output_file.write("- BOGUS NET NAME\n"
+                                + "  (  " + e.conn_in.name + " conn_in )\n"
+                                + "  (  " + e.conn_out.name + " conn_out )\n;\n")
+
     def _min_edge(self, node: Pin)->Edge:
         """Finds best edge to remove from the chain.
 
@@ -250,3 +269,275 @@ class Chip:
             partial_distance[i] += edge2.dist
         standard_dev, mean= self._statistics(partial_distance)
         return global_distance, standard_dev, mean
+
+    def _anytime_nodes(self) -> List[Pin]:
+        """Returns the pins used by the anytime method, indexed as in its successor arrays.
+
+        Pins to route come first, followed by the input drivers and the output drivers.
+        """
+        return self.not_connected + self.driver_pins_plus + self.driver_pins_minus
+
+    def _anytime_digest(self, nodes: List[Pin]) -> str:
+        """Computes a fingerprint of the pins so that a checkpoint is only resumed on the same test."""
+        h = hashlib.sha256()
+        for p in nodes:
+            h.update((str(p) + "\n").encode())
+        return h.hexdigest()
+
+    def _dist(self, a, b):
+        """Manhattan distance between pins a and b, given by their indices (also works with index arrays)."""
+        return np.abs(self._x[a] - self._x[b]) + np.abs(self._y[a] - self._y[b])
+
+    def _init_anytime(self, nodes: List[Pin], seed: int) -> None:
+        """Initializes the state of the anytime method: every input driver is connected to its output driver.
+
+        Variables initialized:
+            self._succ: index of the next pin in the chain (-1 for output drivers and pins not connected).
+            self._pred: index of the previous pin in the chain (-1 for input drivers and pins not connected).
+            self._chain: index of the chain every pin belongs to (-1 for pins not connected).
+            self._lengths: length of every chain.
+            self._pending: random order in which the pins are connected during the construction.
+            self._cursor: number of pins of self._pending already connected.
+            self._stall: number of consecutive improvement moves that did not shorten the chains.
+            self._rng: random generator.
+
+        Args:
+            nodes: list of pins, see _anytime_nodes.
+            seed: seed of the random generator.
+        """
+        n_pins = len(self.not_connected)
+        n_chains = len(self.driver_pins_plus)
+        self._x = np.array([p.x for p in nodes], dtype=np.int64)
+        self._y = np.array([p.y for p in nodes], dtype=np.int64)
+        self._succ = np.full(len(nodes), -1, dtype=np.int64)
+        self._pred = np.full(len(nodes), -1, dtype=np.int64)
+        self._chain = np.full(len(nodes), -1, dtype=np.int64)
+        self._lengths = np.zeros(n_chains, dtype=np.int64)
+        for i in range(n_chains):
+            a = n_pins + i
+            b = n_pins + n_chains + i
+            self._succ[a] = b
+            self._pred[b] = a
+            self._chain[a] = i
+            self._chain[b] = i
+            self._lengths[i] = self._dist(a, b)
+        self._rng = np.random.default_rng(seed)
+        self._pending = self._rng.permutation(n_pins).astype(np.int64)
+        self._cursor = 0
+        self._stall = 0
+
+    def _save_checkpoint(self, checkpoint: str, nodes: List[Pin]) -> None:
+        """Writes the state of the anytime method to a compressed binary file.
+
+        The file is written next to its final location and then renamed, so an interrupted run never leaves a
+        broken checkpoint behind.
+
+        Args:
+            checkpoint: string with the checkpoint filename.
+            nodes: list of pins, see _anytime_nodes.
+        """
+        tmp = checkpoint + ".tmp"
+        with open(tmp, "wb") as file:
+            np.savez_compressed(file,
+                                digest=np.array(self._anytime_digest(nodes)),
+                                succ=self._succ,
+                                lengths=self._lengths,
+                                pending=self._pending[self._cursor:],
+                                stall=np.array(self._stall, dtype=np.int64),
+                                rng_state=np.array(json.dumps(self._rng.bit_generator.state)))
+        os.replace(tmp, checkpoint)
+
+    def _load_checkpoint(self, checkpoint: str, nodes: List[Pin]) -> None:
+        """Restores the state of the anytime method from a checkpoint written by _save_checkpoint.
+
+        Args:
+            checkpoint: string with the checkpoint filename.
+            nodes: list of pins, see _anytime_nodes.
+
+        Raises:
+            ValueError: if the checkpoint was written for a different test.
+        """
+        with np.load(checkpoint, allow_pickle=False) as data:
+            if str(data["digest"]) != self._anytime_digest(nodes):
+                raise ValueError("The checkpoint " + checkpoint + " does not match the pins of this chip.")
+            self._succ = data["succ"].astype(np.int64)
+            self._lengths = data["lengths"].astype(np.int64)
+            self._pending = data["pending"].astype(np.int64)
+            self._stall = int(data["stall"])
+            rng_state = json.loads(str(data["rng_state"]))
+        self._cursor = 0
+        self._rng = np.random.default_rng()
+        self._rng.bit_generator.state = rng_state
+
+        n_pins = len(self.not_connected)
+        self._x = np.array([p.x for p in nodes], dtype=np.int64)
+        self._y = np.array([p.y for p in nodes], dtype=np.int64)
+        self._pred = np.full(len(nodes), -1, dtype=np.int64)
+        linked = np.flatnonzero(self._succ >= 0)
+        self._pred[self._succ[linked]] = linked
+        self._chain = np.full(len(nodes), -1, dtype=np.int64)
+        for i in range(len(self.driver_pins_plus)):
+            a = n_pins + i
+            while a != -1:
+                self._chain[a] = i
+                a = self._succ[a]
+
+    def _link(self, p: int, u: int) -> None:
+        """Connects pin p right after pin u, in the same chain."""
+        v = self._succ[u]
+        self._succ[u] = p
+        self._pred[p] = u
+        self._succ[p] = v
+        self._pred[v] = p
+        self._chain[p] = self._chain[u]
+
+    def _unlink(self, p: int) -> None:
+        """Removes pin p from its chain, connecting its previous and next pins."""
+        u = self._pred[p]
+        v = self._succ[p]
+        self._succ[u] = v
+        self._pred[v] = u
+        self._succ[p] = -1
+        self._pred[p] = -1
+        self._chain[p] = -1
+
+    def _best_insertion(self, p: int) -> Tuple[int, int]:
+        """Finds the best edge of all the chains to insert pin p.
+
+        Args:
+            p: index of a pin that is not connected.
+
+        Returns:
+            u: index of the pin after which p has to be connected.
+            delta: added length of the chain.
+        """
+        u = np.flatnonzero(self._succ >= 0)
+        v = self._succ[u]
+        delta = self._dist(u, p) + self._dist(p, v) - self._dist(u, v)
+        k = int(np.argmin(delta))
+        return int(u[k]), int(delta[k])
+
+    def _anytime_done(self, n_pins: int) -> bool:
+        """The anytime method finishes once every pin is connected and n_pins consecutive moves fail."""
+        return self._cursor == len(self._pending) and self._stall >= n_pins
+
+    def _anytime_step(self, n_pins: int) -> None:
+        """Performs one step of the anytime method.
+
+        During the construction, the next pending pin is connected where it adds the least length. Afterwards, a
+        random pin is removed from its chain and connected again at the best edge of any chain, only if this
+        shortens the chains.
+
+        Args:
+            n_pins: number of pins to route.
+        """
+        if self._cursor < len(self._pending):
+            p = int(self._pending[self._cursor])
+            self._cursor += 1
+            u, delta = self._best_insertion(p)
+            self._lengths[self._chain[u]] += delta
+            self._link(p, u)
+            return
+
+        p = int(self._rng.integers(n_pins))
+        u = int(self._pred[p])
+        v = int(self._succ[p])
+        c = self._chain[p]
+        gain = int(self._dist(u, p) + self._dist(p, v) - self._dist(u, v))
+        self._unlink(p)
+        self._lengths[c] -= gain
+        w, delta = self._best_insertion(p)
+        if delta < gain:
+            self._stall = 0
+        else:
+            w = u
+            delta = gain
+            self._stall += 1
+        self._lengths[self._chain[w]] += delta
+        self._link(p, w)
+
+    def _anytime_graph(self, nodes: List[Pin]) -> Tuple[List[Edge], List[int]]:
+        """Builds a valid solution from the current state of the anytime method.
+
+        Pins still pending from the construction are connected right before the output drivers, distributing them
+        among the chains, so that a solution is available at any time.
+
+        Args:
+            nodes: list of pins, see _anytime_nodes.
+
+        Returns:
+            graph: list with the edges of every chain.
+            partial_distance: list with the length of every chain.
+        """
+        n_pins = len(self.not_connected)
+        n_chains = len(self.driver_pins_plus)
+        succ = self._succ.copy()
+        pred = self._pred.copy()
+        partial_distance = [int(length) for length in self._lengths]
+        for j, p in enumerate(self._pending[self._cursor:]):
+            i = j % n_chains
+            b = n_pins + n_chains + i
+            u = pred[b]
+            succ[u] = p
+            pred[p] = u
+            succ[p] = b
+            pred[b] = p
+            partial_distance[i] += int(self._dist(u, p) + self._dist(p, b) - self._dist(u, b))
+
+        graph = []
+        for i in range(n_chains):
+            a = n_pins + i
+            while succ[a] != -1:
+                graph.append(Edge(nodes[a], nodes[succ[a]], i))
+                a = succ[a]
+        return graph, partial_distance
+
+    def find_paths_anytime(self, checkpoint: str, output: str, slice_seconds: float = 60.0,
+                           deadline: Optional[float] = None, seed: int = 0):
+        """Anytime version of the slow algorithm, that can be stopped and resumed.
+
+        This method first connects the pins one by one, in a random order, at the edge that adds the least length
+        (construction). Then it repeatedly takes a random pin and moves it to the best edge of any chain if this
+        shortens the chains (improvement). The work is done in time slices: after each slice, the state (successor
+        array, length of every chain, pending pins and random generator) is written to the checkpoint file, together
+        with the best solution so far in the output file. If the checkpoint file exists, the method resumes from it,
+        which can be done on another machine as long as the same input file is used.
+
+        Args:
+            checkpoint: string with the checkpoint filename.
+            output: string with the DEF output filename, rewritten after every slice.
+            slice_seconds: duration of every time slice.
+            deadline: seconds after which the method stops, even if it is not finished. None to run until the end.
+            seed: seed of the random generator, ignored when resuming.
+
+        Returns:
+            global_distance: total length of the chains.
+            standard_dev: standard deviation of the lengths of the chains.
+            mean: mean value of the lengths of the cahins.
+        """
+        start = time.monotonic()
+        nodes = self._anytime_nodes()
+        n_pins = len(self.not_connected)
+        if os.path.exists(checkpoint):
+            self._load_checkpoint(checkpoint, nodes)
+        else:
+            self._init_anytime(nodes, seed)
+
+        while True:
+            slice_end = time.monotonic() + slice_seconds
+            if deadline is not None:
+                slice_end = min(slice_end, start + deadline)
+            while not self._anytime_done(n_pins) and time.monotonic() < slice_end:
+                self._anytime_step(n_pins)
+
+            graph, partial_distance = self._anytime_graph(nodes)
+            self._save_checkpoint(checkpoint, nodes)
+            self.write_def(output + ".tmp", graph)
+            os.replace(output + ".tmp", output)
+            if self._anytime_done(n_pins) or (deadline is not None and time.monotonic() >= start + deadline):
+                break
+
+        self.graph = graph
+        self.not_connected = []
+        standard_dev, mean = self._statistics(partial_distance)
+        return sum(partial_distance), standard_dev, mean
@@ -24,6 +24,10 @@ def main():
     elif (method == "slow"):
         global_distance, standard_dev, mean = c.find_paths_slow_version()
 
+    elif (method == "anytime"):
+        # resumes from file + ".ckpt" if a previous run was stopped
+        global_distance, standard_dev, mean = c.find_paths_anytime(file + ".ckpt", file + "_output.def")
+
     # we add driver pins
     for pin_min, pin_plus in zip(c.driver_pins_minus, c.driver_pins_plus):
         G.add_node(pin_plus.name, pos = (pin_plus.x, pin_plus.y), color = 'red')
@@ -41,13 +45,7 @@ def main():
     nx.draw(G, pos = pos, node_size = 5, node_color = colors_list)
 
     # writing the result into a file
-    output_file = open(os.getcwd() + "/" + file + "_output.def", "w")
-    for e in c.graph:
-        output_file.write("- BOGUS NET NAME\n"
-                        + "  (  " + e.conn_in.name + " conn_in )\n"
-                        + "  (  " + e.conn_out.name + " conn_out )\n;\n")
-
-    output_file.close()
+    c.write_def(os.getcwd() + "/" + file + "_output.def")
 
     print('global_distance: ', global_distance)
     print('mean: ', mean)